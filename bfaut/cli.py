@@ -3,11 +3,15 @@
 Autonomous trader for bF
 
 Usage:
-    bfaut stream [--debug] [--sqlite=<path>] [--quiet] [<channel>...]
+    bfaut stream [--debug] [--feed=<name>] [--sqlite=<path>]
+                 [--retention=<days>] [--archive=<dir>] [--quiet]
+                 [<channel>...]
+    bfaut feed [--debug] [--feed=<name>] [--slots=<int>] [--pair=<code>]
+               [--quiet] [<channel>...]
     bfaut init [--debug] [--file=<yaml>]
     bfaut state [--debug] [--file=<yaml>] [--pair=<code>] [<item>...]
     bfaut auto [--debug|--info] [--file=<yaml>] [--pair=<code>]
-               [--timeout=<sec>] [--quiet]
+               [--timeout=<sec>] [--feed=<name>] [--quiet]
     bfaut -h|--help
     bfaut -v|--version
 
@@ -15,7 +19,13 @@ Options:
     -h, --help          Print help and exit
     -v, --version       Print version and exit
     --debug, --info     Execute a command with debug|info messages
-    --sqlite=<path>     Save data in an SQLite3 database
+    --feed=<name>       Set a name of a shared-memory feed
+                        (a feed carries only the ticker and execution
+                         fields recorded by `--sqlite`)
+    --slots=<int>       Set records in a shared-memory feed [default: 65536]
+    --sqlite=<path>     Save data in SQLite3 databases partitioned by day
+    --retention=<days>  Keep today's and <days> previous daily databases
+    --archive=<dir>     Move expired daily databases into a directory
     --file=<yaml>       Set a path to a YAML for configurations [$BFAUT_YML]
     --pair=<code>       Set an actual currency pair [default: BTC_JPY]
     --timeout=<sec>     Set senconds for timeout [default: 3600]
@@ -23,12 +33,15 @@ Options:
 
 Commands:
     stream              Stream rate
+    feed                Publish rate into a shared-memory feed
     init                Generate a YAML template for configuration
     state               Print states of market and account
     auto                Open autonomous trading
 
 Arguments:
     <channel>...        PubNub channels [default: lightning_ticker_BTC_JPY]
+                        (`feed` defaults to the channels used by `auto`,
+                         `stream --feed` defaults to all channels in a feed)
     <item>...           State types { balance, collateral, orders, positions }
 """
 
@@ -36,8 +49,8 @@ import logging
 import os
 from docopt import docopt
 from . import __version__
-from .info import print_states, stream_rate
-from .trader import open_deal
+from .info import print_states, publish_feed, stream_rate
+from .trader import list_trade_channels, open_deal
 from .util import set_config_yml, write_config_yml, read_yaml
 
 
@@ -53,8 +66,25 @@ def main():
     elif args['stream']:
         logging.debug('Stream rate')
         stream_rate(
-            channels=(args['<channel>'] or ['lightning_ticker_BTC_JPY']),
+            channels=(
+                args['<channel>'] or (
+                    None if args['--feed'] else ['lightning_ticker_BTC_JPY']
+                )
+            ),
             sqlite_path=args['--sqlite'],
+            retention=args['--retention'],
+            archive_dir=args['--archive'],
+            feed=args['--feed'],
+            quiet=args['--quiet']
+        )
+    elif args['feed']:
+        logging.debug('Publish feed')
+        publish_feed(
+            channels=(
+                args['<channel>'] or list_trade_channels(pair=args['--pair'])
+            ),
+            name=(args['--feed'] or 'bfaut'),
+            slots=args['--slots'],
             quiet=args['--quiet']
         )
     else:
@@ -66,6 +96,7 @@ def main():
                 config=config,
                 pair=args['--pair'],
                 timeout=args['--timeout'],
+                feed=args['--feed'],
                 quiet=args['--quiet']
             )
         elif args['state']:
@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+
+from collections import namedtuple
+import logging
+import os
+from multiprocessing import resource_tracker, shared_memory
+import time
+import numpy as np
+from pubnub.callbacks import SubscribeCallback
+from .util import BfautError
+
+
+TICKER_FIELDS = [
+    ('product_code', 'S16'),
+    ('timestamp', 'S32'),
+    ('tick_id', '<i8'),
+    ('best_bid', '<f8'),
+    ('best_ask', '<f8'),
+    ('best_bid_size', '<f8'),
+    ('best_ask_size', '<f8'),
+    ('total_bid_depth', '<f8'),
+    ('total_ask_depth', '<f8'),
+    ('ltp', '<f8'),
+    ('volume', '<f8'),
+    ('volume_by_product', '<f8'),
+    ('market_bid_size', '<f8'),
+    ('market_ask_size', '<f8'),
+    ('state', 'S16')
+]
+EXECUTION_FIELDS = [
+    ('id', '<i8'),
+    ('side', 'S4'),
+    ('price', '<f8'),
+    ('size', '<f8'),
+    ('exec_date', 'S32'),
+    ('buy_child_order_acceptance_id', 'S32'),
+    ('sell_child_order_acceptance_id', 'S32')
+]
+DATA_KEYS = [f[0] for f in TICKER_FIELDS + EXECUTION_FIELDS]
+RECORD_DTYPE = np.dtype(
+    [
+        ('message_id', '<u8'), ('row', '<u8'), ('channel', 'S64'),
+        ('nulls', '<u8')
+    ] + TICKER_FIELDS + EXECUTION_FIELDS
+)
+HEADER_DTYPE = np.dtype([
+    ('head', '<u8'), ('reserved', '<u8'), ('slots', '<u8'),
+    ('itemsize', '<u8'), ('message_id', '<u8'), ('pid', '<u8')
+])
+
+BfFeedMessage = namedtuple('BfFeedMessage', ['channel', 'message'])
+
+
+def _attach_ring(name):
+    try:
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, 'shared_memory')
+    except FileNotFoundError:
+        raise BfautError('The feed does not exist: {}'.format(name))
+    return shm
+
+
+def _is_alive(pid):
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _unlink_stale_ring(name):
+    shm = _attach_ring(name=name)
+    try:
+        pid = (
+            int(np.ndarray(
+                shape=(), dtype=HEADER_DTYPE, buffer=shm.buf
+            )['pid']) if shm.size >= HEADER_DTYPE.itemsize else 0
+        )
+        if _is_alive(pid):
+            raise BfautError(
+                'The feed already exists: {0} (pid: {1})'.format(name, pid)
+            )
+    finally:
+        shm.close()
+    stale = shared_memory.SharedMemory(name=name)
+    stale.close()
+    stale.unlink()
+
+
+def _map_ring(shm):
+    header = np.ndarray(shape=(), dtype=HEADER_DTYPE, buffer=shm.buf)
+    if header['itemsize'] != RECORD_DTYPE.itemsize:
+        raise BfautError(
+            'Incompatible feed record size: {}'.format(header['itemsize'])
+        )
+    records = np.ndarray(
+        shape=(int(header['slots']),), dtype=RECORD_DTYPE, buffer=shm.buf,
+        offset=HEADER_DTYPE.itemsize
+    )
+    return header, records
+
+
+class BfFeedPublisher(SubscribeCallback):
+    def __init__(self, name, slots=65536, quiet=False):
+        self.logger = logging.getLogger(__name__)
+        slots = self._validate_slots(slots=slots)
+        size = HEADER_DTYPE.itemsize + RECORD_DTYPE.itemsize * slots
+        try:
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=size
+            )
+        except FileExistsError:
+            _unlink_stale_ring(name=name)
+            self.logger.warning('Reclaim a stale feed: {}'.format(name))
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=size
+            )
+        header = np.ndarray(shape=(), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        header[()] = (0, 0, slots, RECORD_DTYPE.itemsize, 0, os.getpid())
+        self.header, self.records = _map_ring(shm=self.shm)
+        self.quiet = quiet
+        self.unknown_keys = set()                               # mutable
+        self.logger.debug(vars(self))
+
+    @staticmethod
+    def _validate_slots(slots):
+        if not str(slots).isdigit() or int(slots) < 1:
+            raise BfautError(
+                'Slots must be a positive integer: {}'.format(slots)
+            )
+        return int(slots)
+
+    def message(self, pubnub, message):
+        if message.channel.startswith('lightning_ticker_'):
+            rows = [message.message]
+        elif message.channel.startswith('lightning_executions_'):
+            rows = message.message
+        else:
+            self.logger.error('message.channel: {}'.format(message.channel))
+            return
+        slots = self.records.shape[0]
+        if len(rows) > slots:
+            self.logger.error(
+                'Drop a message larger than the feed: {0} > {1} ({2})'.format(
+                    len(rows), slots, message.channel
+                )
+            )
+            return
+        message_id = int(self.header['message_id']) + 1
+        try:
+            records = [
+                tuple(
+                    self._encode(
+                        key=k, value=row.get(k),
+                        dtype=RECORD_DTYPE.fields[k][0]
+                    ) for k in RECORD_DTYPE.names
+                ) for row in [
+                    dict(
+                        r, message_id=message_id, row=i,
+                        channel=message.channel,
+                        nulls=sum(
+                            1 << j for j, k in enumerate(DATA_KEYS)
+                            if r.get(k) is None
+                        )
+                    ) for i, r in enumerate(rows)
+                ]
+            ]
+        except BfautError as e:
+            self.logger.error(
+                'Drop a message from {0}: {1}'.format(message.channel, e)
+            )
+            return
+        unknown_keys = {
+            k for r in rows for k in r if k not in RECORD_DTYPE.names
+        }.difference(self.unknown_keys)
+        if unknown_keys:
+            self.logger.warning(
+                'Fields not carried by the feed: {}'.format(
+                    sorted(unknown_keys)
+                )
+            )
+            self.unknown_keys.update(unknown_keys)
+        head = int(self.header['head'])
+        self.header['reserved'] = head + len(rows)
+        for i, r in enumerate(records):
+            self.records[(head + i) % slots] = r
+        self.header['message_id'] = message_id
+        self.header['head'] = head + len(rows)
+        if not self.quiet:
+            print({message.channel: message.message})
+
+    @staticmethod
+    def _encode(key, value, dtype):
+        if dtype.kind == 'S':
+            encoded = (value or '').encode()
+            if len(encoded) > dtype.itemsize:
+                raise BfautError(
+                    'Too long for {0} ({1} bytes): {2}'.format(
+                        key, dtype.itemsize, value
+                    )
+                )
+            return encoded
+        elif dtype.kind == 'f':
+            return np.nan if value is None else value
+        else:
+            return 0 if value is None else value
+
+    def close(self):
+        del self.header, self.records
+        self.shm.close()
+        self.shm.unlink()
+
+
+class BfFeedSubscriber:
+    def __init__(self, name, channels=None, interval=0.01):
+        self.logger = logging.getLogger(__name__)
+        self.shm = _attach_ring(name=name)
+        self.header, self.records = _map_ring(shm=self.shm)
+        self.channels = set(channels or [])
+        self.interval = interval
+        self.listeners = []
+        self.name = name
+        self.pid = int(self.header['pid'])
+        self.cursor = int(self.header['head'])                  # mutable
+        self.n_overrun = 0                                      # mutable
+        self.logger.debug(vars(self))
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def start(self):
+        while True:
+            if not self.poll():
+                time.sleep(self.interval)
+
+    def poll(self):
+        head = int(self.header['head'])
+        slots = self.records.shape[0]
+        if head - self.cursor > slots:
+            self._skip(cursor=(head - slots))
+        elif head == self.cursor:
+            self._check_publisher()
+            return 0
+        start, stop = self.cursor % slots, head % slots
+        views = (
+            [self.records[start:stop]] if start < stop
+            else [self.records[start:], self.records[:stop]]
+        )
+        chunks = self._split_messages(views=views)
+        messages = [
+            m for m in self._decode(chunks=chunks)
+            if not self.channels or m.channel in self.channels
+        ]
+        reserved = int(self.header['reserved'])
+        if reserved - self.cursor > slots:
+            self._skip(cursor=(reserved - slots))
+            return 0
+        self.cursor = head
+        n_partial = sum([c.size for c in chunks if c['row'][0] != 0])
+        if n_partial:
+            self._count_overrun(n=n_partial)
+        for m in messages:
+            for listener in self.listeners:
+                try:
+                    listener.message(None, m)
+                except Exception as e:
+                    self.logger.error(e)
+        return len(messages)
+
+    def _check_publisher(self):
+        if int(self.header['pid']) != self.pid or not _is_alive(self.pid):
+            raise BfautError(
+                'The feed publisher has exited: {0} (pid: {1})'.format(
+                    self.name, self.pid
+                )
+            )
+
+    def _skip(self, cursor):
+        self._count_overrun(n=(cursor - self.cursor))
+        self.cursor = cursor
+
+    def _count_overrun(self, n):
+        self.n_overrun += n
+        self.logger.warning(
+            'Feed overrun: {0} records lost (total: {1})'.format(
+                n, self.n_overrun
+            )
+        )
+
+    @staticmethod
+    def _split_messages(views):
+        chunks = []
+        for v in [v for v in views if v.size]:
+            bounds = np.flatnonzero(np.diff(v['message_id'])) + 1
+            for c in np.split(v, bounds):
+                if chunks and (
+                        chunks[-1]['message_id'][0] == c['message_id'][0]
+                ):
+                    chunks[-1] = np.concatenate([chunks[-1], c])
+                else:
+                    chunks.append(c)
+        return chunks
+
+    @staticmethod
+    def _decode(chunks):
+        for rows in [c for c in chunks if c['row'][0] == 0]:
+            channel = rows['channel'][0].decode()
+            if channel.startswith('lightning_ticker_'):
+                keys, many = [f[0] for f in TICKER_FIELDS], False
+            else:
+                keys, many = [f[0] for f in EXECUTION_FIELDS], True
+            bits = [DATA_KEYS.index(k) for k in keys]
+            decoded = [
+                {
+                    k: (
+                        None if (nulls >> b) & 1 else (
+                            v.decode() if isinstance(v, bytes) else v
+                        )
+                    ) for k, b, v in zip(keys, bits, t)
+                } for nulls, t in zip(
+                    rows['nulls'].tolist(), rows[keys].tolist()
+                )
+            ]
+            yield BfFeedMessage(
+                channel=channel, message=(decoded if many else decoded[0])
+            )
+
+    def close(self):
+        del self.header, self.records
+        self.shm.close()
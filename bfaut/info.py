@@ -1,14 +1,15 @@
 #!/usr/bin/env python
 
+import logging
 from pprint import pprint
 import signal
-import sqlite3
-import pandas as pd
 from pubnub.callbacks import SubscribeCallback
 from pubnub.pnconfiguration import PNConfiguration, PNReconnectionPolicy
 from pubnub.pubnub_tornado import PubNubTornado
 import pybitflyer
 from tornado import gen
+from .feed import BfFeedPublisher, BfFeedSubscriber
+from .recorder import BfSqliteRecorder
 
 
 class BfAsyncSubscriber:
@@ -25,44 +26,66 @@ class BfAsyncSubscriber:
 
 
 class BfSubscribeCallback(SubscribeCallback):
-    def __init__(self, sqlite_path=None, quiet=False):
-        self.db = sqlite3.connect(sqlite_path) if sqlite_path else None
+    def __init__(self, sqlite_path=None, retention=None, archive_dir=None,
+                 quiet=False):
+        self.recorder = (
+            BfSqliteRecorder(
+                sqlite_path=sqlite_path, retention=retention,
+                archive_dir=archive_dir
+            ) if sqlite_path else None
+        )
         self.quiet = quiet
+        if self.recorder:
+            self.recorder.start()
 
     def message(self, pubnub, message):
-        if self.db:
-            if message.channel.startswith('lightning_ticker_'):
-                pd.DataFrame(
-                    [message.message]
-                ).assign(
-                    timestamp=lambda d: pd.to_datetime(d['timestamp'])
-                ).set_index(
-                    'timestamp'
-                ).to_sql(
-                    name=message.channel, con=self.db, if_exists='append'
-                )
-            elif message.channel.startswith('lightning_executions_'):
-                pd.DataFrame(
-                    message.message
-                ).assign(
-                    exec_date=lambda d: pd.to_datetime(d['exec_date'])
-                ).set_index(
-                    'exec_date'
-                ).to_sql(
-                    name=message.channel, con=self.db, if_exists='append'
-                )
+        if self.recorder:
+            self.recorder.record(
+                channel=message.channel, message=message.message
+            )
         if not self.quiet:
             print({message.channel: message.message})
 
+    def close(self):
+        if self.recorder:
+            self.recorder.stop()
 
-def stream_rate(channels, sqlite_path=None, quiet=False):
-    bas = BfAsyncSubscriber(channels=channels)
-    bas.pubnub.add_listener(
-        BfSubscribeCallback(sqlite_path=sqlite_path, quiet=quiet)
+
+def stream_rate(channels, sqlite_path=None, retention=None, archive_dir=None,
+                feed=None, quiet=False):
+    bsc = BfSubscribeCallback(
+        sqlite_path=sqlite_path, retention=retention,
+        archive_dir=archive_dir, quiet=quiet
     )
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        if feed:
+            bfs = BfFeedSubscriber(name=feed, channels=channels)
+            bfs.add_listener(bsc)
+            bfs.start()
+        else:
+            bas = BfAsyncSubscriber(channels=channels)
+            bas.pubnub.add_listener(bsc)
+            bas.subscribe()
+            bas.pubnub.start()
+    except KeyboardInterrupt:
+        logging.debug('Stop streaming')
+    finally:
+        bsc.close()
+
+
+def publish_feed(channels, name, slots=65536, quiet=False):
+    bfp = BfFeedPublisher(name=name, slots=slots, quiet=quiet)
+    bas = BfAsyncSubscriber(channels=channels)
+    bas.pubnub.add_listener(bfp)
     bas.subscribe()
-    signal.signal(signal.SIGINT, signal.SIG_DFL)
-    bas.pubnub.start()
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        bas.pubnub.start()
+    except KeyboardInterrupt:
+        logging.debug('Stop publishing')
+    finally:
+        bfp.close()
 
 
 def print_states(config, pair, items):
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+
+from datetime import datetime, timedelta
+import glob
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import pandas as pd
+from .util import BfautError
+
+
+TABLE_SCHEMAS = {
+    'lightning_ticker_': {
+        'time_key': 'timestamp',
+        'columns': [
+            ('timestamp', 'TEXT NOT NULL'),
+            ('product_code', 'TEXT'),
+            ('tick_id', 'INTEGER'),
+            ('best_bid', 'REAL'),
+            ('best_ask', 'REAL'),
+            ('best_bid_size', 'REAL'),
+            ('best_ask_size', 'REAL'),
+            ('total_bid_depth', 'REAL'),
+            ('total_ask_depth', 'REAL'),
+            ('ltp', 'REAL'),
+            ('volume', 'REAL'),
+            ('volume_by_product', 'REAL'),
+            ('market_bid_size', 'REAL'),
+            ('market_ask_size', 'REAL'),
+            ('state', 'TEXT')
+        ]
+    },
+    'lightning_executions_': {
+        'time_key': 'exec_date',
+        'columns': [
+            ('exec_date', 'TEXT NOT NULL'),
+            ('id', 'INTEGER'),
+            ('side', 'TEXT'),
+            ('price', 'REAL'),
+            ('size', 'REAL'),
+            ('buy_child_order_acceptance_id', 'TEXT'),
+            ('sell_child_order_acceptance_id', 'TEXT')
+        ]
+    }
+}
+
+
+def _parse_datetime(series):
+    return pd.to_datetime(
+        series.astype(str).str.replace(
+            r'(T\d{2}:\d{2}:\d{2})(?:\.(\d+))?',
+            lambda m: '{0}.{1:0<6.6}'.format(m.group(1), m.group(2) or ''),
+            regex=True
+        ),
+        utc=True, errors='coerce'
+    )
+
+
+class BfSqliteRecorder:
+    def __init__(self, sqlite_path, retention=None, archive_dir=None,
+                 interval=3600):
+        self.logger = logging.getLogger(__name__)
+        self.root, self.ext = os.path.splitext(sqlite_path)
+        self.retention = (
+            self._validate_retention(retention=retention)
+            if retention is not None else None
+        )
+        self.archive_dir = archive_dir
+        self.interval = interval
+        self.dbs = {}                                           # mutable
+        self.tables = set()                                     # mutable
+        self.unknown_keys = set()                               # mutable
+        self.stopped = threading.Event()
+        self.maintainer = threading.Thread(
+            target=self._maintain_periodically, daemon=True
+        )
+        self.logger.debug(vars(self))
+
+    @staticmethod
+    def _validate_retention(retention):
+        if not str(retention).isdigit() or int(retention) < 1:
+            raise BfautError(
+                'Retention must be a positive integer: {}'.format(retention)
+            )
+        return int(retention)
+
+    def start(self):
+        self.maintainer.start()
+
+    def stop(self):
+        self.stopped.set()
+        for db in self.dbs.values():
+            db.close()
+        self.dbs = {}
+
+    def record(self, channel, message):
+        for prefix, schema in TABLE_SCHEMAS.items():
+            if channel.startswith(prefix):
+                break
+        else:
+            self.logger.debug('Skip recording: {}'.format(channel))
+            return
+        rows = message if isinstance(message, list) else [message]
+        columns = [c for c, _ in schema['columns']]
+        unknown_keys = {
+            k for r in rows for k in r if k not in columns
+        }.difference(self.unknown_keys)
+        if unknown_keys:
+            self.logger.warning(
+                'Fields not recorded: {}'.format(sorted(unknown_keys))
+            )
+            self.unknown_keys.update(unknown_keys)
+        df = pd.DataFrame(rows).reindex(columns=columns)
+        df[schema['time_key']] = _parse_datetime(
+            series=df[schema['time_key']]
+        ).dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+        n_null = int(df[schema['time_key']].isnull().sum())
+        if n_null:
+            self.logger.warning(
+                'Drop {0} records without valid {1}: {2}'.format(
+                    n_null, schema['time_key'], channel
+                )
+            )
+        closed = self._closed_date()
+        for day, d in df.groupby(df[schema['time_key']].str[:10]):
+            date = day.replace('-', '')
+            if date < closed:
+                self.logger.warning(
+                    'Drop {0} records for a closed partition: {1}'.format(
+                        d.shape[0], self.partition_path(date=date)
+                    )
+                )
+                continue
+            db = self._connect(date=date)
+            self._create_table(date=date, name=channel, schema=schema)
+            with db:
+                db.executemany(
+                    'INSERT INTO "{0}" VALUES ({1})'.format(
+                        channel, ', '.join(['?'] * d.shape[1])
+                    ),
+                    d.astype(object).where(d.notnull(), None).values.tolist()
+                )
+
+    def partition_path(self, date):
+        return '{0}.{1}{2}'.format(self.root, date, self.ext)
+
+    def _connect(self, date):
+        if date not in self.dbs:
+            path = self.partition_path(date=date)
+            self.logger.info('Open a partition: {}'.format(path))
+            self.dbs[date] = sqlite3.connect(path)
+            closed = self._closed_date()
+            for k in [k for k in sorted(self.dbs) if k != date and k < closed]:
+                self.logger.info(
+                    'Close a partition: {}'.format(self.partition_path(k))
+                )
+                self.dbs.pop(k).close()
+                self.tables = {t for t in self.tables if t[0] != k}
+        return self.dbs[date]
+
+    def _create_table(self, date, name, schema):
+        if (date, name) not in self.tables:
+            db = self.dbs[date]
+            with db:
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS "{0}" ({1})'.format(
+                        name, ', '.join([
+                            '{0} {1}'.format(*c) for c in schema['columns']
+                        ])
+                    )
+                )
+                db.execute(
+                    'CREATE INDEX IF NOT EXISTS "{0}_{1}" '
+                    'ON "{0}" ({1})'.format(name, schema['time_key'])
+                )
+            self.tables.add((date, name))
+
+    def _list_partitions(self):
+        pattern = re.compile(
+            re.escape(self.root) + r'\.(\d{8})' + re.escape(self.ext) + '$'
+        )
+        return sorted([
+            (m.group(1), p) for m, p in [
+                (pattern.match(p), p) for p in glob.glob(
+                    '{0}.*{1}'.format(glob.escape(self.root), self.ext)
+                )
+            ] if m
+        ])
+
+    def _maintain_periodically(self):
+        while not self.stopped.is_set():
+            try:
+                self.maintain()
+            except Exception as e:
+                self.logger.error(e)
+            self.stopped.wait(self.interval)
+
+    @staticmethod
+    def _closed_date(today=None):
+        return (
+            (today or datetime.utcnow().date()) - timedelta(days=1)
+        ).strftime('%Y%m%d')
+
+    def maintain(self, today=None):
+        today = today or datetime.utcnow().date()
+        closed = self._closed_date(today=today)
+        expired = (
+            (today - timedelta(days=self.retention)).strftime('%Y%m%d')
+            if self.retention else None
+        )
+        for date, path in self._list_partitions():
+            if date >= closed:
+                continue
+            is_expired = bool(expired and date < expired)
+            try:
+                if is_expired and not self.archive_dir:
+                    self.logger.info('Remove a partition: {}'.format(path))
+                    os.remove(path)
+                else:
+                    self._compact(path=path)
+                    if is_expired:
+                        self._archive(path=path)
+            except Exception as e:
+                self.logger.error(e)
+
+    def _compact(self, path):
+        db = sqlite3.connect(path)
+        try:
+            if db.execute('PRAGMA user_version').fetchone()[0] == 0:
+                self.logger.info('Compact a partition: {}'.format(path))
+                db.execute('VACUUM')
+                db.execute('PRAGMA user_version = 1')
+        finally:
+            db.close()
+
+    def _archive(self, path):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        dst = os.path.join(self.archive_dir, os.path.basename(path))
+        if os.path.exists(dst):
+            raise BfautError(
+                'The partition already exists in the archive: {}'.format(dst)
+            )
+        self.logger.info('Archive a partition: {0} => {1}'.format(path, dst))
+        shutil.move(path, dst)
@@ -8,6 +8,7 @@ import numpy as np
 import pandas as pd
 from pubnub.callbacks import SubscribeCallback
 import pybitflyer
+from .feed import BfFeedSubscriber
 from .info import BfAsyncSubscriber
 from .util import BfautError
 
@@ -417,21 +418,28 @@ class BfStreamTrader(SubscribeCallback):
                     pprint(order)
 
 
-def open_deal(config, pair, timeout=3600, quiet=False):
-    bas = BfAsyncSubscriber(
-        channels=[
-            'lightning_executions_FX_{}'.format(pair),
-            'lightning_ticker_FX_{}'.format(pair),
-            'lightning_ticker_{}'.format(pair)
-        ]
-    )
-    bas.pubnub.add_listener(
-        BfStreamTrader(
-            config=config, pair=pair, timeout=timeout, quiet=quiet
-        )
+def list_trade_channels(pair):
+    return [
+        'lightning_executions_FX_{}'.format(pair),
+        'lightning_ticker_FX_{}'.format(pair),
+        'lightning_ticker_{}'.format(pair)
+    ]
+
+
+def open_deal(config, pair, timeout=3600, feed=None, quiet=False):
+    bst = BfStreamTrader(
+        config=config, pair=pair, timeout=timeout, quiet=quiet
     )
-    bas.subscribe()
+    if feed:
+        bfs = BfFeedSubscriber(name=feed, channels=list_trade_channels(pair))
+        bfs.add_listener(bst)
+        start = bfs.start
+    else:
+        bas = BfAsyncSubscriber(channels=list_trade_channels(pair))
+        bas.pubnub.add_listener(bst)
+        bas.subscribe()
+        start = bas.pubnub.start
     signal.signal(signal.SIGINT, signal.SIG_DFL)
     if not quiet:
         print('!!! OPEN DEAL !!!')
-    bas.pubnub.start()
+    start()